@@ -1,113 +1,160 @@
 import streamlit as st
-from sqlmodel import SQLModel, Field, Session, create_engine, select, Relationship
-from datetime import datetime, timedelta
+from sqlmodel import select, func, text
+from sqlalchemy import insert
+from datetime import datetime
 import pandas as pd
 import numpy as np
 import altair as alt
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
-import io
-import random
 
-# -------------------------------
-# DATABASE MODELS
-# -------------------------------
-
-class Staff(SQLModel, table=True):
-    id: int = Field(default=None, primary_key=True)
-    name: str
-    role: str
-    hospital: str
-    region: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-
-    surgeries: "list[Surgery] | None" = Relationship(back_populates="staff")
-    targets: "list[Target] | None" = Relationship(back_populates="staff")
-
-
-class Surgery(SQLModel, table=True):
-    id: int = Field(default=None, primary_key=True)
-    staff_id: int = Field(foreign_key="staff.id")
-    hospital: str
-    region: str
-    date: datetime = Field(default_factory=datetime.utcnow)
-
-    staff: "Staff | None" = Relationship(back_populates="surgeries")
-
-
-class Target(SQLModel, table=True):
-    id: int = Field(default=None, primary_key=True)
-    staff_id: int = Field(foreign_key="staff.id")
-    month: str
-    target_surgeries: int
-    assigned_at: datetime = Field(default_factory=datetime.utcnow)
-
-    staff: "Staff | None" = Relationship(back_populates="targets")
-
-
-# -------------------------------
-# DATABASE SETUP
-# -------------------------------
-
-engine = create_engine("sqlite:///surgipulse.db")
-SQLModel.metadata.create_all(engine)
+# Models, schema setup and the export renderers live in their own modules so
+# they are imported once per process instead of re-executed on every rerun.
+from models import Staff, Surgery, Target, engine, get_session
+from seed import init_db
+from exports import export_excel, export_pdf
 
-def get_session():
-    return Session(engine)
+init_db()
 
 
 # -------------------------------
-# SEED DEFAULT STAFF (only once)
+# CACHED QUERIES
 # -------------------------------
-def seed_default_staff():
+# Streamlit reruns the whole script on every widget change. The loaders
+# below are memoized on data_version(), a cheap token that only changes
+# when rows are added, so unchanged data is served from the cache.
+# Every insert mints a new version and only the current one is ever read,
+# so each loader keeps just the last few versions instead of one frame per
+# insert for the life of the process.
+VERSION_CACHE_ENTRIES = 4
+
+def data_version():
     with get_session() as session:
-        existing = session.exec(select(Staff)).all()
-        if not existing:
-            staff_list = [
-                Staff(name="Josephine", role="Nurse", hospital="Moi Teaching & Referral Hospital", region="Eldoret"),
-                Staff(name="Carol", role="Surgeon", hospital="Aga Khan University Hospital", region="Nairobi/Kijabe"),
-                Staff(name="Jacob", role="Technician", hospital="Meru Teaching & Referral", region="Meru"),
-                Staff(name="Naomi", role="Nurse", hospital="Coast General Hospital", region="Mombasa"),
-                Staff(name="Charity", role="Surgeon", hospital="Kenyatta National Hospital", region="Nairobi/Kijabe"),
-                Staff(name="Kevin", role="Assistant", hospital="St. Luke’s Orthopedic Hospital", region="Eldoret"),
-                Staff(name="Miriam", role="Surgeon", hospital="Meru Level 5 Hospital", region="Meru"),
-                Staff(name="Brian", role="Technician", hospital="Mombasa Hospital", region="Mombasa"),
-                Staff(name="James", role="Surgeon", hospital="Kijabe Mission Hospital", region="Nairobi/Kijabe"),
-                Staff(name="Faith", role="Nurse", hospital="Reale Hospital", region="Eldoret"),
-                Staff(name="Geoffrey", role="Technician", hospital="Mater Hospital", region="Nairobi/Kijabe"),
-                Staff(name="Spencer", role="Surgeon", hospital="Pandya Memorial Hospital", region="Mombasa"),
-                Staff(name="Evans", role="Nurse", hospital="Meru General Hospital", region="Meru"),
-                Staff(name="Eric", role="Surgeon", hospital="Moi Teaching & Referral Hospital", region="Eldoret"),
-            ]
-            session.add_all(staff_list)
-            session.commit()
-
-seed_default_staff()
+        return tuple(session.exec(text(
+            "SELECT (SELECT COUNT(*) FROM staff), "
+            "(SELECT COUNT(*) FROM surgery), (SELECT MAX(id) FROM surgery), "
+            "(SELECT COUNT(*) FROM target), (SELECT MAX(id) FROM target)"
+        )).one())
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def load_staff(version):
+    return pd.read_sql_query(
+        "SELECT id, name AS Staff, role AS Role, hospital AS Hospital, region AS Region FROM staff",
+        engine,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def load_region_counts(version):
+    # One row per region, so the chart payload doesn't grow with the table
+    return pd.read_sql_query(
+        "SELECT region AS Region, COUNT(*) AS Surgeries FROM surgery GROUP BY region",
+        engine,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def load_monthly_trend(version):
+    return pd.read_sql_query(
+        "SELECT strftime('%Y-%m', date) AS Month, COUNT(*) AS \"Total Surgeries\" "
+        "FROM surgery GROUP BY 1 ORDER BY 1",
+        engine,
+    )
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def load_surgery_report(version):
+    # Join staff names in SQL rather than touching s.staff per row.
+    df = pd.read_sql_query(
+        "SELECT staff.name AS Staff, surgery.hospital AS Hospital, surgery.region AS Region, surgery.date AS Date "
+        "FROM surgery JOIN staff ON staff.id = surgery.staff_id ORDER BY surgery.id",
+        engine, parse_dates=["Date"], dtype={"Staff": "category", "Hospital": "category", "Region": "category"},
+    )
+    df["Date"] = df["Date"].dt.date
+    return df
+
+
+# download_button needs its bytes up front, so the report files would
+# otherwise be rebuilt on every Reports rerun. Keying them on the data
+# version also avoids re-hashing the whole report frame each time. Each
+# entry holds a full file, so keep only the latest couple of versions.
+@st.cache_data(show_spinner=False, max_entries=2)
+def report_excel(version):
+    return export_excel(load_surgery_report(version))
+
+
+@st.cache_data(show_spinner=False, max_entries=2)
+def report_pdf(version):
+    return export_pdf(load_surgery_report(version))
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def get_staff_progress(version):
+    # Aggregate each child table on its own before joining, otherwise
+    # surgeries and targets multiply each other's row counts.
+    surgery_counts = (
+        select(Surgery.staff_id, func.count(Surgery.id).label("surgeries"))
+        .group_by(Surgery.staff_id)
+        .subquery()
+    )
+    target_totals = (
+        select(Target.staff_id, func.sum(Target.target_surgeries).label("target"))
+        .group_by(Target.staff_id)
+        .subquery()
+    )
+    stmt = (
+        select(
+            Staff.name,
+            func.coalesce(surgery_counts.c.surgeries, 0),
+            func.coalesce(target_totals.c.target, 0),
+        )
+        .outerjoin(surgery_counts, surgery_counts.c.staff_id == Staff.id)
+        .outerjoin(target_totals, target_totals.c.staff_id == Staff.id)
+        # Without this SQLite returns rows in whatever order its plan scans
+        # staff (currently by name via ix_staff_name)
+        .order_by(Staff.id)
+    )
+    with get_session() as session:
+        rows = session.exec(stmt).all()
+    return pd.DataFrame(rows, columns=["Staff", "Surgeries", "Target"])
 
 
 # -------------------------------
-# EXPORT HELPERS
+# CACHED CHARTS
 # -------------------------------
-def export_excel(df: pd.DataFrame):
-    output = io.BytesIO()
-    with pd.ExcelWriter(output, engine="openpyxl") as writer:
-        df.to_excel(writer, index=False, sheet_name="Report")
-    return output.getvalue()
-
-def export_pdf(df: pd.DataFrame):
-    buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
-    text = c.beginText(40, height - 40)
-    text.setFont("Helvetica", 10)
-    lines = df.to_string(index=False).split("\n")
-    for line in lines:
-        text.textLine(line)
-    c.drawText(text)
-    c.showPage()
-    c.save()
-    buffer.seek(0)
-    return buffer.getvalue()
+# st.altair_chart rebuilds and validates the Vega-Lite spec on every rerun.
+# These cache the finished spec per data version instead, bounded like the
+# loaders they wrap; st.vega_lite_chart renders it as-is.
+def chart_spec(chart):
+    # Streamlit swaps Altair's default theme for "none" the same way
+    with alt.themes.enable("none"):
+        return chart.to_dict()
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def region_chart_spec(version):
+    return chart_spec(alt.Chart(load_region_counts(version)).mark_bar().encode(
+        x="Region", y="Surgeries:Q", color="Region"
+    ))
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def trend_chart_spec(version, this_month):
+    all_months = pd.period_range("2025-01", this_month, freq="M").astype(str)
+    trend = load_monthly_trend(version)
+    trend = trend.set_index("Month").reindex(all_months, fill_value=0).rename_axis("Month").reset_index()
+    return chart_spec(alt.Chart(trend).mark_line(point=True).encode(
+        x="Month", y="Total Surgeries"
+    ))
+
+
+@st.cache_data(show_spinner=False, max_entries=VERSION_CACHE_ENTRIES)
+def hospital_chart_spec(version):
+    # Count in pandas so Vega gets one row per hospital, not every surgery
+    df = load_surgery_report(version)
+    hospitals = df["Hospital"].value_counts().rename_axis("Hospital").reset_index(name="Surgeries")
+    return chart_spec(alt.Chart(hospitals).mark_bar().encode(
+        x="Hospital", y="Surgeries:Q", color="Hospital"
+    ))
 
 
 # -------------------------------
@@ -115,23 +162,26 @@ def export_pdf(df: pd.DataFrame):
 # -------------------------------
 def generate_random_surgeries():
     with get_session() as session:
-        staff_list = session.exec(select(Staff)).all()
+        staff_list = session.exec(select(Staff.id, Staff.hospital, Staff.region)).all()
         start_date = datetime(2025, 1, 1)
         end_date = datetime.today()
         days = (end_date - start_date).days
 
-        for s in staff_list:
-            # Each staff gets between 10–50 surgeries randomly spread across months
-            num_surgeries = random.randint(10, 50)
-            for _ in range(num_surgeries):
-                random_date = start_date + timedelta(days=random.randint(0, days))
-                surgery = Surgery(
-                    staff_id=s.id,
-                    hospital=s.hospital,
-                    region=s.region,
-                    date=random_date
-                )
-                session.add(surgery)
+        # Each staff gets between 10–50 surgeries randomly spread across months;
+        # draw all counts and day offsets in two batched calls.
+        rng = np.random.default_rng()
+        per_staff = rng.integers(10, 51, size=len(staff_list))
+        staff_idx = np.repeat(np.arange(len(staff_list)), per_staff)
+        offsets = rng.integers(0, days + 1, size=len(staff_idx))
+        dates = (np.datetime64(start_date, "us") + offsets.astype("timedelta64[D]")).tolist()
+
+        rows = [
+            {"staff_id": staff_list[i].id, "hospital": staff_list[i].hospital, "region": staff_list[i].region, "date": date}
+            for i, date in zip(staff_idx.tolist(), dates)
+        ]
+        # One Core executemany INSERT in the session's transaction; skips the
+        # ORM flush machinery entirely, like the staff seed.
+        session.execute(insert(Surgery), rows)
         session.commit()
 
 
@@ -142,6 +192,7 @@ def generate_random_surgeries():
 st.set_page_config(page_title="SurgiPulse Dashboard", layout="wide")
 st.sidebar.title("⚙️ SurgiPulse Navigation")
 page = st.sidebar.radio("Go to", ["Dashboard", "Log Surgery", "Assign Targets", "Reports", "Leaderboard", "⚡ Generate Test Data"])
+version = data_version()
 
 
 # -------------------------------
@@ -149,34 +200,21 @@ page = st.sidebar.radio("Go to", ["Dashboard", "Log Surgery", "Assign Targets",
 # -------------------------------
 if page == "Dashboard":
     st.title("📊 Surgery Dashboard")
-    with get_session() as session:
-        surgeries = session.exec(select(Surgery)).all()
-        staff = session.exec(select(Staff)).all()
+    regions = load_region_counts(version)
 
-        col1, col2 = st.columns(2)
-        col1.metric("Total Surgeries", len(surgeries))
-        col2.metric("Total Staff", len(staff))
-
-        if surgeries:
-            df = pd.DataFrame([{"Region": s.region, "Hospital": s.hospital, "Date": s.date.date()} for s in surgeries])
-
-            # Surgeries by Region
-            st.subheader("📍 Surgeries by Region")
-            region_chart = alt.Chart(df).mark_bar().encode(
-                x="Region", y="count()", color="Region"
-            )
-            st.altair_chart(region_chart, use_container_width=True)
-
-            # Trend by Month
-            st.subheader("📈 Monthly Surgery Trend (Jan–Now)")
-            df["Month"] = pd.to_datetime(df["Date"]).dt.to_period("M").astype(str)
-            trend = df.groupby("Month").size().reset_index(name="Total Surgeries")
-            all_months = pd.period_range("2025-01", datetime.today().strftime("%Y-%m")).astype(str)
-            trend = trend.set_index("Month").reindex(all_months, fill_value=0).reset_index().rename(columns={"index": "Month"})
-            line_chart = alt.Chart(trend).mark_line(point=True).encode(
-                x="Month", y="Total Surgeries"
-            )
-            st.altair_chart(line_chart, use_container_width=True)
+    col1, col2 = st.columns(2)
+    col1.metric("Total Surgeries", int(regions["Surgeries"].sum()))
+    col2.metric("Total Staff", len(load_staff(version)))
+
+    if not regions.empty:
+        # Surgeries by Region
+        st.subheader("📍 Surgeries by Region")
+        st.vega_lite_chart(region_chart_spec(version), use_container_width=True)
+
+        # Trend by Month
+        st.subheader("📈 Monthly Surgery Trend (Jan–Now)")
+        this_month = datetime.today().strftime("%Y-%m")
+        st.vega_lite_chart(trend_chart_spec(version, this_month), use_container_width=True)
 
 
 # -------------------------------
@@ -184,21 +222,24 @@ if page == "Dashboard":
 # -------------------------------
 elif page == "Log Surgery":
     st.title("📝 Log Surgery")
-    with get_session() as session:
-        staff_list = session.exec(select(Staff)).all()
-        staff_dict = {s.name: s for s in staff_list}
-        staff_name = st.selectbox("Select Staff", list(staff_dict.keys()))
-        staff = staff_dict[staff_name]
-
-        hospital = st.text_input("Hospital", staff.hospital)
-        region = st.text_input("Region", staff.region)
+    staff_df = load_staff(version).set_index("Staff")
+    staff_name = st.selectbox("Select Staff", staff_df.index.tolist())
+    staff = staff_df.loc[staff_name]
+
+    # The staff picker stays outside the form so it can prefill the fields
+    # below; edits inside the form only rerun the script on submit.
+    with st.form("log_surgery"):
+        hospital = st.text_input("Hospital", staff["Hospital"])
+        region = st.text_input("Region", staff["Region"])
         date = st.date_input("Surgery Date", datetime.today())
+        submitted = st.form_submit_button("Log Surgery")
 
-        if st.button("Log Surgery"):
-            new_surgery = Surgery(staff_id=staff.id, hospital=hospital, region=region, date=date)
+    if submitted:
+        with get_session() as session:
+            new_surgery = Surgery(staff_id=int(staff["id"]), hospital=hospital, region=region, date=date)
             session.add(new_surgery)
             session.commit()
-            st.success(f"Surgery logged for {staff_name} on {date}")
+        st.success(f"Surgery logged for {staff_name} on {date}")
 
 
 # -------------------------------
@@ -206,23 +247,24 @@ elif page == "Log Surgery":
 # -------------------------------
 elif page == "Assign Targets":
     st.title("🎯 Assign Surgery Targets")
-    with get_session() as session:
-        staff_list = session.exec(select(Staff)).all()
-        staff_dict = {s.name: s for s in staff_list}
-        staff_name = st.selectbox("Select Staff", list(staff_dict.keys()))
-        staff = staff_dict[staff_name]
+    staff_df = load_staff(version).set_index("Staff")
+    staff_name = st.selectbox("Select Staff", staff_df.index.tolist())
+    staff = staff_df.loc[staff_name]
 
+    with st.form("assign_target"):
         month = st.selectbox("Month", [
             "January", "February", "March", "April", "May", "June",
             "July", "August", "September", "October", "November", "December"
         ])
         target = st.number_input("Target Surgeries", min_value=1, step=1)
+        submitted = st.form_submit_button("Assign Target")
 
-        if st.button("Assign Target"):
-            new_target = Target(staff_id=staff.id, month=month, target_surgeries=target)
+    if submitted:
+        with get_session() as session:
+            new_target = Target(staff_id=int(staff["id"]), month=month, target_surgeries=target)
             session.add(new_target)
             session.commit()
-            st.success(f"Assigned target of {target} surgeries for {staff_name} in {month}")
+        st.success(f"Assigned target of {target} surgeries for {staff_name} in {month}")
 
 
 # -------------------------------
@@ -230,26 +272,28 @@ elif page == "Assign Targets":
 # -------------------------------
 elif page == "Reports":
     st.title("📑 Reports")
-    with get_session() as session:
-        surgeries = session.exec(select(Surgery)).all()
-        if surgeries:
-            df = pd.DataFrame([{"Staff": s.staff.name, "Hospital": s.hospital, "Region": s.region, "Date": s.date.date()} for s in surgeries])
-            st.subheader("Surgeries by Staff")
-            st.dataframe(df)
-
-            col1, col2 = st.columns(2)
-            with col1:
-                excel = export_excel(df)
-                st.download_button("⬇ Export to Excel", excel, "report.xlsx")
-            with col2:
-                pdf = export_pdf(df)
-                st.download_button("⬇ Export to PDF", pdf, "report.pdf", mime="application/pdf")
-
-            st.subheader("📊 Surgeries by Hospital")
-            hospital_chart = alt.Chart(df).mark_bar().encode(
-                x="Hospital", y="count()", color="Hospital"
-            )
-            st.altair_chart(hospital_chart, use_container_width=True)
+    df = load_surgery_report(version)
+    if not df.empty:
+        st.subheader("Surgeries by Staff")
+        # Only ship one page of rows to the browser; the exports below still
+        # cover the full report.
+        page_size = 100
+        page_count = (len(df) - 1) // page_size + 1
+        page_no = st.number_input("Page", min_value=1, max_value=page_count, step=1)
+        start = (page_no - 1) * page_size
+        st.dataframe(df.iloc[start:start + page_size], hide_index=True, use_container_width=True)
+        st.caption(f"Rows {start + 1}–{min(start + page_size, len(df))} of {len(df)}")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            excel = report_excel(version)
+            st.download_button("⬇ Export to Excel", excel, "report.xlsx")
+        with col2:
+            pdf = report_pdf(version)
+            st.download_button("⬇ Export to PDF", pdf, "report.pdf", mime="application/pdf")
+
+        st.subheader("📊 Surgeries by Hospital")
+        st.vega_lite_chart(hospital_chart_spec(version), use_container_width=True)
 
 
 # -------------------------------
@@ -257,21 +301,12 @@ elif page == "Reports":
 # -------------------------------
 elif page == "Leaderboard":
     st.title("🏆 Leaderboard")
-    with get_session() as session:
-        staff_list = session.exec(select(Staff)).all()
-        leaderboard = []
-        for s in staff_list:
-            surgeries = session.exec(select(Surgery).where(Surgery.staff_id == s.id)).all()
-            targets = session.exec(select(Target).where(Target.staff_id == s.id)).all()
-            total_target = sum(t.target_surgeries for t in targets)
-            leaderboard.append({
-                "Staff": s.name,
-                "Surgeries": len(surgeries),
-                "Target": total_target,
-                "Progress": f"{len(surgeries)}/{total_target}" if total_target else "No target"
-            })
-        df = pd.DataFrame(leaderboard).sort_values(by="Surgeries", ascending=False)
-        st.dataframe(df)
+    df = get_staff_progress(version)
+    df["Progress"] = np.where(
+        df["Target"] > 0, df["Surgeries"].astype(str) + "/" + df["Target"].astype(str), "No target"
+    )
+    df = df.sort_values(by="Surgeries", ascending=False, kind="stable")
+    st.dataframe(df)
 
 
 # -------------------------------
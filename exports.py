@@ -0,0 +1,52 @@
+import pandas as pd
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import PageBreak, SimpleDocTemplate, Table, TableStyle
+import io
+import xlsxwriter
+
+# -------------------------------
+# EXPORT HELPERS
+# -------------------------------
+def export_excel(df: pd.DataFrame):
+    # Write rows straight through xlsxwriter. to_excel fills the sheet column
+    # by column, which rules out constant_memory; row by row, each row is
+    # flushed as soon as the next one starts instead of kept in memory.
+    output = io.BytesIO()
+    workbook = xlsxwriter.Workbook(output, {"constant_memory": True, "default_date_format": "yyyy-mm-dd"})
+    sheet = workbook.add_worksheet("Report")
+    sheet.write_row(0, 0, df.columns.tolist(), workbook.add_format({"bold": True}))
+    for row_no, row in enumerate(df.itertuples(index=False), start=1):
+        sheet.write_row(row_no, 0, row)
+    workbook.close()
+    return output.getvalue()
+
+# Built once at import instead of on every export
+PDF_TABLE_STYLE = TableStyle([("FONT", (0, 0), (-1, -1), "Helvetica", 10)])
+# 10pt Helvetica has a 12pt leading, plus the table's 3pt top/bottom padding
+PDF_ROW_HEIGHT = 18
+
+def export_pdf(df: pd.DataFrame):
+    # Splitting one long platypus Table across pages re-copies the remaining
+    # rows at every break, which goes quadratic on big reports. Emit one
+    # table per page instead, each sized to fit the frame and followed by an
+    # explicit page break, with column widths measured once so the pages
+    # line up.
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+    cells = df.astype(str)
+    header = [str(c) for c in df.columns]
+    rows = cells.values.tolist()
+    col_widths = [
+        max(stringWidth(v, "Helvetica", 10) for v in {h, *cells[c].unique()}) + 12
+        for h, c in zip(header, df.columns)
+    ]
+    # The frame keeps 6pt of padding top and bottom; one row is the header
+    per_page = int((doc.height - 12) // PDF_ROW_HEIGHT) - 1
+    story = []
+    for i in range(0, max(len(rows), 1), per_page):
+        if story:
+            story.append(PageBreak())
+        story.append(Table([header] + rows[i:i + per_page], colWidths=col_widths, rowHeights=PDF_ROW_HEIGHT, style=PDF_TABLE_STYLE))
+    doc.build(story)
+    return buffer.getvalue()
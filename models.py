@@ -0,0 +1,90 @@
+import streamlit as st
+from sqlmodel import SQLModel, Field, Session, create_engine, Relationship, Index
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+from typing import List, Optional
+
+# -------------------------------
+# DATABASE MODELS
+# -------------------------------
+
+class Staff(SQLModel, table=True):
+    id: int = Field(default=None, primary_key=True)
+    name: str = Field(unique=True, index=True)
+    role: str
+    hospital: str
+    region: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+    # lazy="raise" turns any per-row relationship access back into an error
+    # instead of a silent extra SELECT; query the columns you need instead.
+    surgeries: List["Surgery"] = Relationship(back_populates="staff", sa_relationship_kwargs={"lazy": "raise"})
+    targets: List["Target"] = Relationship(back_populates="staff", sa_relationship_kwargs={"lazy": "raise"})
+
+
+class Surgery(SQLModel, table=True):
+    id: int = Field(default=None, primary_key=True)
+    staff_id: int = Field(foreign_key="staff.id", index=True)
+    hospital: str
+    # Lets the Dashboard's GROUP BY region read the index alone
+    region: str = Field(index=True)
+    date: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+    staff: Optional["Staff"] = Relationship(back_populates="surgeries", sa_relationship_kwargs={"lazy": "raise"})
+
+
+class Target(SQLModel, table=True):
+    # Covers the per-staff SUM(target_surgeries) without touching the table
+    __table_args__ = (Index("ix_target_staff_id_target_surgeries", "staff_id", "target_surgeries"),)
+
+    id: int = Field(default=None, primary_key=True)
+    staff_id: int = Field(foreign_key="staff.id")
+    month: str
+    target_surgeries: int
+    assigned_at: datetime = Field(default_factory=datetime.utcnow)
+
+    staff: Optional["Staff"] = Relationship(back_populates="targets", sa_relationship_kwargs={"lazy": "raise"})
+
+
+# -------------------------------
+# DATABASE SETUP
+# -------------------------------
+
+# Keep one engine (and so one connection pool) for the whole process rather
+# than a new engine, and fresh SQLite connections, on every rerun.
+@st.cache_resource(show_spinner=False)
+def get_engine():
+    engine = create_engine(
+        "sqlite:///surgipulse.db",
+        connect_args={"check_same_thread": False},
+        poolclass=QueuePool,
+        pool_size=5,
+        max_overflow=10,
+    )
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside a writer and, with synchronous=NORMAL,
+        # avoids an fsync on every commit.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        # Wait for a concurrent writer instead of failing with "database is
+        # locked", and give each connection a ~20 MB page cache.
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.execute("PRAGMA cache_size=-20000")
+        cursor.close()
+
+    return engine
+
+engine = get_engine()
+# Nothing reads ORM objects back after a commit, so skip the expire/refetch;
+# writes commit explicitly, so there is nothing for autoflush to do either.
+SessionLocal = sessionmaker(bind=engine, class_=Session, expire_on_commit=False, autoflush=False)
+
+def get_session():
+    return SessionLocal()
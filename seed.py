@@ -0,0 +1,55 @@
+import streamlit as st
+from sqlmodel import SQLModel, func
+from sqlalchemy import insert
+
+from models import Staff, engine, get_session
+
+# -------------------------------
+# SEED DEFAULT STAFF (only once)
+# -------------------------------
+DEFAULT_STAFF = [
+    {"name": "Josephine", "role": "Nurse", "hospital": "Moi Teaching & Referral Hospital", "region": "Eldoret"},
+    {"name": "Carol", "role": "Surgeon", "hospital": "Aga Khan University Hospital", "region": "Nairobi/Kijabe"},
+    {"name": "Jacob", "role": "Technician", "hospital": "Meru Teaching & Referral", "region": "Meru"},
+    {"name": "Naomi", "role": "Nurse", "hospital": "Coast General Hospital", "region": "Mombasa"},
+    {"name": "Charity", "role": "Surgeon", "hospital": "Kenyatta National Hospital", "region": "Nairobi/Kijabe"},
+    {"name": "Kevin", "role": "Assistant", "hospital": "St. Luke’s Orthopedic Hospital", "region": "Eldoret"},
+    {"name": "Miriam", "role": "Surgeon", "hospital": "Meru Level 5 Hospital", "region": "Meru"},
+    {"name": "Brian", "role": "Technician", "hospital": "Mombasa Hospital", "region": "Mombasa"},
+    {"name": "James", "role": "Surgeon", "hospital": "Kijabe Mission Hospital", "region": "Nairobi/Kijabe"},
+    {"name": "Faith", "role": "Nurse", "hospital": "Reale Hospital", "region": "Eldoret"},
+    {"name": "Geoffrey", "role": "Technician", "hospital": "Mater Hospital", "region": "Nairobi/Kijabe"},
+    {"name": "Spencer", "role": "Surgeon", "hospital": "Pandya Memorial Hospital", "region": "Mombasa"},
+    {"name": "Evans", "role": "Nurse", "hospital": "Meru General Hospital", "region": "Meru"},
+    {"name": "Eric", "role": "Surgeon", "hospital": "Moi Teaching & Referral Hospital", "region": "Eldoret"},
+]
+
+def seed_default_staff():
+    # Staff names are unique, so INSERT OR IGNORE lets SQLite skip the rows
+    # that already exist without probing the table or building ORM objects.
+    # created_at is filled in by SQLite as part of the same statement.
+    with get_session() as session:
+        session.execute(
+            insert(Staff).prefix_with("OR IGNORE").values(created_at=func.now()),
+            DEFAULT_STAFF,
+        )
+        session.commit()
+
+
+# -------------------------------
+# DATABASE INIT (once per process)
+# -------------------------------
+# Streamlit re-executes this script on every widget change; cache_resource
+# keeps schema setup and seeding to the first run of the process.
+@st.cache_resource(show_spinner=False)
+def init_db():
+    SQLModel.metadata.create_all(engine)
+
+    # create_all skips tables that already exist, so databases created before
+    # an index was declared still need it added.
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+    seed_default_staff()